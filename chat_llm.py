@@ -1,9 +1,22 @@
+import collections
+import json
+import os
+import requests
 import streamlit as st
 from LLMSuiteHandler import send_post_request_to_llm  # Import your backend function
 
+# OpenAI-compatible chat endpoint used for token streaming; when unset,
+# responses come from the blocking backend call in one piece
+LLM_STREAM_URL = os.environ.get("LLM_STREAM_URL")
+LLM_STREAM_MODEL = os.environ.get("LLM_STREAM_MODEL")
+LLM_STREAM_API_KEY = os.environ.get("LLM_STREAM_API_KEY")
+
+# Only the most recent turns are kept and sent to the LLM
+MAX_TURNS = 20
+
 # Initialize session state for conversation history and settings
 if "messages" not in st.session_state:
-    st.session_state.messages = []
+    st.session_state.messages = collections.deque(maxlen=2 * MAX_TURNS)
 
 # Default system prompt
 DEFAULT_SYSTEM_PROMPT = """You are a helpful AI assistant created by DeepSeek. 
@@ -14,50 +27,88 @@ If you don't know the answer, say you don't know rather than making something up
 with st.sidebar:
     st.title("Settings")
     
-    # System prompt customization
-    system_prompt = st.text_area(
-        "System Prompt", 
-        value=DEFAULT_SYSTEM_PROMPT,
-        help="This guides the assistant's behavior"
-    )
+    # Apply settings together so editing several of them costs one rerun
+    with st.form("chat_settings"):
+        # System prompt customization
+        system_prompt = st.text_area(
+            "System Prompt", 
+            value=DEFAULT_SYSTEM_PROMPT,
+            help="This guides the assistant's behavior"
+        )
+        
+        # Model parameters
+        st.subheader("Model Parameters")
+        temperature = st.slider("Temperature", 0.0, 1.0, 0.7, help="Controls randomness")
+        max_tokens = st.number_input("Max Tokens", 50, 2000, 500, help="Maximum response length")
+        st.form_submit_button("Apply")
     
-    # Model parameters
-    st.subheader("Model Parameters")
-    temperature = st.slider("Temperature", 0.0, 1.0, 0.7, help="Controls randomness")
-    max_tokens = st.number_input("Max Tokens", 50, 2000, 500, help="Maximum response length")
+    if not LLM_STREAM_URL:
+        st.caption(
+            "Streaming is off: replies arrive in one piece once complete. "
+            "Set LLM_STREAM_URL, LLM_STREAM_MODEL and LLM_STREAM_API_KEY "
+            "to stream tokens from an OpenAI-compatible endpoint."
+        )
     
     # Conversation controls
     st.subheader("Conversation Controls")
     if st.button("Clear Conversation"):
-        st.session_state.messages = []
+        st.session_state.messages.clear()
         st.rerun()
 
-def generate_response(user_input):
-    """Generate response from LLM using conversation context"""
-    # Prepare the conversation history including system prompt
-    messages_for_llm = [{"role": "system", "content": system_prompt}]
-    
-    # Add previous conversation history (if any)
-    for msg in st.session_state.messages:
-        if msg["role"] == "user":
-            messages_for_llm.append({"role": "user", "content": msg["content"]})
-        else:
-            messages_for_llm.append({"role": "assistant", "content": msg["content"]})
-    
-    # Add the new user message
-    messages_for_llm.append({"role": "user", "content": user_input})
+@st.cache_resource
+def get_http_session():
+    """Shared session so streamed requests reuse pooled connections"""
+    return requests.Session()
+
+def build_llm_params(user_input):
+    """Build the LLM request parameters using conversation context"""
+    # System prompt, the bounded recent history, then the new user message
+    messages_for_llm = [
+        {"role": "system", "content": system_prompt},
+        *({"role": msg["role"], "content": msg["content"]} for msg in st.session_state.messages),
+        {"role": "user", "content": user_input}
+    ]
     
     # Prepare parameters for the LLM call
-    params = {
+    return {
         "messages": messages_for_llm,
         "temperature": temperature,
         "max_tokens": max_tokens
     }
-    
+
+def generate_response(user_input):
+    """Generate response from LLM using conversation context"""
     # Send to your LLM backend
-    response = send_post_request_to_llm(params)
+    return send_post_request_to_llm(build_llm_params(user_input))
+
+def stream_response(user_input):
+    """Yield response tokens from the LLM as they arrive"""
+    if not LLM_STREAM_URL:
+        yield generate_response(user_input)
+        return
     
-    return response
+    params = build_llm_params(user_input)
+    headers = {"Authorization": f"Bearer {LLM_STREAM_API_KEY}"} if LLM_STREAM_API_KEY else {}
+    with get_http_session().post(
+        LLM_STREAM_URL,
+        json={**params, "model": LLM_STREAM_MODEL, "stream": True},
+        headers=headers,
+        stream=True,
+        timeout=60
+    ) as resp:
+        resp.raise_for_status()
+        # Server-sent events: one "data: {json}" line per chunk, ending with "data: [DONE]"
+        for line in resp.iter_lines():
+            if not line.startswith(b"data: "):
+                continue
+            data = line[len(b"data: "):]
+            if data == b"[DONE]":
+                break
+            # Usage and keep-alive chunks arrive with no choices
+            choices = json.loads(data).get("choices") or []
+            token = choices[0].get("delta", {}).get("content") if choices else None
+            if token:
+                yield token
 
 # Main chat interface
 st.title("DeepSeek-like Chat Assistant")
@@ -79,14 +130,8 @@ if prompt := st.chat_input("What would you like to know?"):
     
     # Display assistant response in chat message container
     with st.chat_message("assistant"):
-        response_placeholder = st.empty()
-        full_response = ""
-        
-        # Simulate streaming response (adjust based on your backend capabilities)
-        response = generate_response(prompt)
-        full_response = response
-        
-        response_placeholder.markdown(full_response)
+        # Render tokens as they arrive instead of waiting for the full reply
+        full_response = st.write_stream(stream_response(prompt))
     
     # Add assistant response to chat history
     st.session_state.messages.append({"role": "assistant", "content": full_response})
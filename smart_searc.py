@@ -1,98 +1,265 @@
 import streamlit as st
-from streamlit_extras.stylable_container import stylable_container
 import requests
-from bs4 import BeautifulSoup
-import json
+import requests.adapters
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+    from bs4 import BeautifulSoup
+import collections
+import itertools
+import orjson
 import random
+import re
+import asyncio
+import importlib.util
+import httpx
+
+# Fallback data if the resource files don't exist
+FALLBACK_PROMPTS = {
+    "general": [
+        "What is the weather today?",
+        "How to make a cake?",
+        "Latest tech news",
+        "Best restaurants nearby"
+    ],
+    "tech": [
+        "How to use Python with Streamlit?",
+        "What is AI?",
+        "Latest JavaScript frameworks",
+        "Cloud computing trends 2023"
+    ]
+}
+
+FALLBACK_WORKFLOWS = {
+    "Search DeepSeek on Google": {
+        "description": "Searches DeepSeek on Google and opens the first result",
+        "steps": [
+            {"action": "search_google", "query": "DeepSeek"},
+            {"action": "open_first_result"}
+        ]
+    },
+    "Find Python Documentation": {
+        "description": "Finds and opens Python official documentation",
+        "steps": [
+            {"action": "search_google", "query": "Python official documentation"},
+            {"action": "open_first_result"}
+        ]
+    }
+}
 
-# Load predefined prompts and workflows
+# Load predefined prompts and workflows, parsed once per process
+@st.cache_resource
 def load_resources():
-    with open('prompts.json', 'r') as f:
-        prompts = json.load(f)
-    with open('workflows.json', 'r') as f:
-        workflows = json.load(f)
+    try:
+        with open('prompts.json', 'rb') as f:
+            prompts = orjson.loads(f.read())
+        with open('workflows.json', 'rb') as f:
+            workflows = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return FALLBACK_PROMPTS, FALLBACK_WORKFLOWS
     return prompts, workflows
 
+# Session state defaults; mutable values come from factories so sessions never share them
+_SESSION_DEFAULTS = {
+    'input_text': "",
+    'show_workflow': False,
+    'current_workflow': None,
+    'sandbox_url': None,
+    'search_executed': False,
+    'last_input': "",
+}
+_SESSION_FACTORIES = {
+    'suggestions': list,
+    'search_history': lambda: collections.deque(maxlen=50),
+    'workflow_results': dict,
+}
+
 # Initialize session state
-if 'input_text' not in st.session_state:
-    st.session_state.input_text = ""
-if 'show_workflow' not in st.session_state:
-    st.session_state.show_workflow = False
-if 'current_workflow' not in st.session_state:
-    st.session_state.current_workflow = None
-if 'suggestions' not in st.session_state:
-    st.session_state.suggestions = []
-if 'sandbox_url' not in st.session_state:
-    st.session_state.sandbox_url = None
-if 'search_executed' not in st.session_state:
-    st.session_state.search_executed = False
-if 'last_input' not in st.session_state:
-    st.session_state.last_input = ""
-if 'search_history' not in st.session_state:
-    st.session_state.search_history = []
-
-# Load resources
-try:
-    PROMPTS, WORKFLOWS = load_resources()
-except:
-    # Fallback data if files don't exist
-    PROMPTS = {
-        "general": [
-            "What is the weather today?",
-            "How to make a cake?",
-            "Latest tech news",
-            "Best restaurants nearby"
-        ],
-        "tech": [
-            "How to use Python with Streamlit?",
-            "What is AI?",
-            "Latest JavaScript frameworks",
-            "Cloud computing trends 2023"
-        ]
-    }
+for key, value in _SESSION_DEFAULTS.items():
+    st.session_state.setdefault(key, value)
+for key, factory in _SESSION_FACTORIES.items():
+    if key not in st.session_state:
+        st.session_state[key] = factory()
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# Shared HTTP session so searches reuse keep-alive connections
+@st.cache_resource
+def get_http_session():
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=1)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# Google Custom Search credentials from st.secrets, or None when not configured.
+# Resolve this on the script thread, outside cached functions: indexing st.secrets
+# without a secrets.toml draws an error box on the page before raising.
+def _search_api_credentials():
+    if not st.secrets.load_if_toml_exists():
+        return None
+    if "GOOGLE_API_KEY" not in st.secrets or "GOOGLE_CSE_ID" not in st.secrets:
+        return None
+    return st.secrets["GOOGLE_API_KEY"], st.secrets["GOOGLE_CSE_ID"]
+
+# URL, query params and whether it's the JSON API, for one search
+def _search_request(query, credentials):
+    if credentials is not None:
+        # The JSON API returns just the results, so there's no page to parse
+        api_key, cx = credentials
+        params = {"key": api_key, "cx": cx, "q": query, "num": 3}
+        return "https://www.googleapis.com/customsearch/v1", params, True
+    # Without API credentials, fall back to scraping the results page
+    # Let the HTTP client URL-encode the query
+    return "https://www.google.com/search", {"q": query, "num": 10}, False
+
+# Turn a search response body into result dicts
+def _parse_search_body(body, is_api):
+    if is_api:
+        items = orjson.loads(body).get('items', [])
+        return [{'title': item['title'], 'link': item['link']} for item in items[:3]]
+    return parse_search_results(body)
+
+# Each organic result opens a div whose class list starts with "g". Only the top
+# three are kept, so the async workflow fetch stops downloading after a few more
+# have started to arrive. Closing a response mid-body drops its connection rather
+# than returning it to the pool; that's fine for the per-batch async client, but the
+# shared sync session reads whole pages so its keep-alive connections get reused.
+_RESULT_MARKER = re.compile(rb'class="g[ "]')
+_EARLY_STOP_MARKERS = 6
+_CHUNK_SIZE = 8192
+
+def _count_new_markers(buf, start):
+    # Back up by one byte less than the 9-byte marker so matches straddling
+    # chunks are found, but ones complete before `start` aren't counted again
+    return len(_RESULT_MARKER.findall(buf, max(0, start - 8)))
+
+# Read a results page only until enough result blocks are in
+async def _read_results_page_async(chunks):
+    buf = bytearray()
+    seen = 0
+    async for chunk in chunks:
+        start = len(buf)
+        buf += chunk
+        seen += _count_new_markers(buf, start)
+        if seen >= _EARLY_STOP_MARKERS:
+            break
+    return buf.decode('utf-8', errors='ignore')
+
+# Fetch top Google results; cached, so it must not touch the page
+@st.cache_data(ttl=600, max_entries=256, show_spinner=False)
+def fetch_search_results(query, credentials=None):
+    url, params, is_api = _search_request(query, credentials)
+    response = get_http_session().get(url, params=params, timeout=5)
+    # Raise on error pages too, so a 429/5xx isn't cached as "no results"
+    response.raise_for_status()
+    return _parse_search_body(response.text, is_api)
+
+# Extract result titles/links from a Google results page
+def parse_search_results(html):
+    results = []
+    if HTMLParser is not None:
+        for g in HTMLParser(html).css('div.g'):
+            anchor = g.css_first('a[href]')
+            title = g.css_first('h3')
+            if anchor and title:
+                results.append({'title': title.text(), 'link': anchor.attributes['href']})
+                if len(results) == 3:  # Return top 3 results
+                    break
+        return results
     
-    WORKFLOWS = {
-        "Search DeepSeek on Google": {
-            "description": "Searches DeepSeek on Google and opens the first result",
-            "steps": [
-                {"action": "search_google", "query": "DeepSeek"},
-                {"action": "open_first_result"}
-            ]
-        },
-        "Find Python Documentation": {
-            "description": "Finds and opens Python official documentation",
-            "steps": [
-                {"action": "search_google", "query": "Python official documentation"},
-                {"action": "open_first_result"}
-            ]
-        }
-    }
+    # Fall back to BeautifulSoup, still on the C-based lxml backend
+    soup = BeautifulSoup(html, 'lxml')
+    for g in soup.find_all('div', class_='g'):
+        anchor = g.find('a')
+        if anchor and 'href' in anchor.attrs:
+            link = anchor['href']
+            title = g.find('h3')
+            if title:
+                title = title.text
+                results.append({'title': title, 'link': link})
+                if len(results) == 3:  # Return top 3 results
+                    break
+    
+    return results
+
+def _normalize_query(query):
+    # Queries differing only in case/whitespace share results
+    return query.strip().lower()
 
 # Function to get Google search results
 def search_google(query):
     try:
-        url = f"https://www.google.com/search?q={query}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        results = []
-        
-        for g in soup.find_all('div', class_='g'):
-            anchor = g.find('a')
-            if anchor and 'href' in anchor.attrs:
-                link = anchor['href']
-                title = g.find('h3')
-                if title:
-                    title = title.text
-                    results.append({'title': title, 'link': link})
-        
-        return results[:3]  # Return top 3 results
+        return fetch_search_results(_normalize_query(query), _search_api_credentials())
     except Exception as e:
         st.error(f"Error performing search: {e}")
         return []
 
+async def _fetch_async(client, query, credentials):
+    url, params, is_api = _search_request(_normalize_query(query), credentials)
+    async with client.stream("GET", url, params=params) as response:
+        response.raise_for_status()
+        if is_api:
+            await response.aread()
+            return _parse_search_body(response.text, is_api)
+        body = await _read_results_page_async(response.aiter_bytes(_CHUNK_SIZE))
+    return _parse_search_body(body, is_api)
+
+# httpx only speaks HTTP/2 with the optional h2 package; without it, http2=True raises
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Issue all searches on one event loop and yield (query, results, error) as each completes
+async def _iter_fetch_async(queries, credentials):
+    async def fetch(client, query):
+        try:
+            return query, await _fetch_async(client, query, credentials), None
+        except Exception as e:
+            return query, [], e
+    
+    async with httpx.AsyncClient(http2=_HTTP2, follow_redirects=True, timeout=5, headers={"User-Agent": USER_AGENT}) as client:
+        tasks = [asyncio.ensure_future(fetch(client, q)) for q in queries]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # If the consumer stops early, don't leave requests running on a closing loop
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+# Run several searches concurrently, yielding (query, results) as each one finishes.
+# Results are remembered for the session so reruns that redraw a workflow don't refetch.
+def iter_google_many(queries):
+    memo = st.session_state.workflow_results
+    pending = []
+    for query in dict.fromkeys(queries):
+        if query in memo:
+            yield query, memo[query]
+        else:
+            pending.append(query)
+    if not pending:
+        return
+    
+    # Drive the async generator step by step so each result can be rendered as it lands
+    loop = asyncio.new_event_loop()
+    results_iter = _iter_fetch_async(pending, _search_api_credentials())
+    try:
+        while True:
+            try:
+                query, results, error = loop.run_until_complete(results_iter.__anext__())
+            except StopAsyncIteration:
+                break
+            if error is not None:
+                st.error(f"Error performing search: {error}")
+            else:
+                memo[query] = results
+            yield query, results
+    finally:
+        loop.run_until_complete(results_iter.aclose())
+        loop.close()
+
 # Function to update suggestions
 def update_suggestions():
     current_input = st.session_state.search_input
@@ -104,31 +271,66 @@ def update_suggestions():
             st.session_state.suggestions = []
         st.session_state.search_executed = False
 
+# Widget callbacks run before the rerun a click triggers, so the top of main()
+# already sees the new state and no extra st.rerun() is needed
+def select_pick(key):
+    picked = st.session_state[key]
+    if picked is not None:
+        st.session_state.selected_suggestion = picked
+        # Clear the selection so the same item can be picked again later
+        st.session_state[key] = None
+
+def feeling_lucky():
+    st.session_state.input_text = random.choice(_all_prompts())
+    st.session_state.search_input = st.session_state.input_text
+    st.session_state.search_executed = True
+
+# Prompts paired with their lowercased form, computed once per process
+@st.cache_resource
+def _indexed_prompts():
+    prompts, _ = load_resources()
+    general = [(p, p.lower()) for p in prompts.get('general', [])]
+    tech = [(p, p.lower()) for p in prompts.get('tech', [])]
+    return general, tech
+
+# Every prompt in one list, built once instead of concatenated per use
+@st.cache_resource
+def _all_prompts():
+    prompts, _ = load_resources()
+    return prompts.get('general', []) + prompts.get('tech', [])
+
+# Collect up to `limit` prompts containing the needle
+def _match_prompts(indexed, needle, limit=5):
+    matches = []
+    for prompt, low in indexed:
+        if needle in low:
+            matches.append(prompt)
+            if len(matches) == limit:
+                break
+    return matches
+
 # Function to get suggested prompts
 def get_suggested_prompts(input_text):
-    input_text = input_text.strip().lower()
-    if not input_text:
+    needle = input_text.strip().lower()
+    if not needle:
         return []
-    suggestions = []
+    general, tech = _indexed_prompts()
     # Search in general prompts
-    for prompt in PROMPTS.get('general', []):
-        if input_text in prompt.lower():
-            suggestions.append(prompt)
+    suggestions = _match_prompts(general, needle)
     # If nothing found, search in tech prompts
     if not suggestions:
-        for prompt in PROMPTS.get('tech', []):
-            if input_text in prompt.lower():
-                suggestions.append(prompt)
+        suggestions = _match_prompts(tech, needle)
     # If still nothing, show random prompts
     if not suggestions:
-        all_prompts = PROMPTS.get('general', []) + PROMPTS.get('tech', [])
+        all_prompts = _all_prompts()
         if all_prompts:
             suggestions = random.sample(all_prompts, min(3, len(all_prompts)))
-    return suggestions[:5]  # Limit to top 5 suggestions
+    return suggestions  # Already limited to top 5 suggestions
 
 # Function to execute workflows
 def execute_workflow(workflow_name):
-    workflow = WORKFLOWS.get(workflow_name)
+    _, workflows = load_resources()
+    workflow = workflows.get(workflow_name)
     if not workflow:
         st.error("Workflow not found")
         return
@@ -141,122 +343,148 @@ def execute_workflow(workflow_name):
     st.write(f"## Executing Workflow: {workflow_name}")
     st.write(workflow['description'])
     
+    # Lay out every step first, then fill each one in as soon as its search finishes
+    slots = []
+    source_query = None
     for step in workflow['steps']:
         if step['action'] == "search_google":
-            st.write(f"🔍 Searching Google for: {step['query']}")
-            results = search_google(step['query'])
-            st.session_state.search_results = results
-            
+            source_query = step['query']
+            st.write(f"🔍 Searching Google for: {source_query}")
+            slot = st.empty()
+            slot.caption("Searching...")
+            slots.append((slot, step['action'], source_query))
+        elif step['action'] == "open_first_result":
+            if source_query is not None:
+                slots.append((st.empty(), step['action'], source_query))
+            elif 'search_results' in st.session_state:
+                render_workflow_step(st.empty(), step['action'], st.session_state.search_results)
+    
+    results_by_query = {}
+    for query, results in iter_google_many(slot_query for _, _, slot_query in slots):
+        results_by_query[query] = results
+        for slot, action, slot_query in slots:
+            if slot_query == query:
+                render_workflow_step(slot, action, results)
+    if source_query is not None:
+        st.session_state.search_results = results_by_query[source_query]
+
+# Render one workflow step's output into its placeholder
+def render_workflow_step(slot, action, results):
+    with slot.container():
+        if action == "search_google":
             for i, result in enumerate(results, 1):
                 st.write(f"{i}. {result['title']}")
                 st.write(f"   {result['link']}")
-                
-        elif step['action'] == "open_first_result" and 'search_results' in st.session_state:
-            if st.session_state.search_results:
-                first_result = st.session_state.search_results[0]['link']
-                st.write(f"🌐 First result: {first_result}")
-                # Show a button to open in new tab
-                st.markdown(
-                    f'<a href="{first_result}" target="_blank"><button>Open First Result in New Tab</button></a>',
-                    unsafe_allow_html=True
-                )
+        elif action == "open_first_result" and results:
+            first_result = results[0]['link']
+            st.write(f"🌐 First result: {first_result}")
+            # Show a button to open in new tab
+            st.markdown(
+                f'<a href="{first_result}" target="_blank"><button>Open First Result in New Tab</button></a>',
+                unsafe_allow_html=True
+            )
+
+# Page CSS, built once per process and re-sent on each rerun
+@st.cache_resource
+def _css():
+    return """
+<style>
+/* Main container styling */
+.stApp {
+    background-color: #f9fafb;
+}
+
+/* Search bar styling */
+.stTextInput>div>div>input {
+    padding: 16px 24px !important;
+    border-radius: 24px !important;
+    border: 1px solid #e5e7eb !important;
+    box-shadow: 0 1px 2px rgba(0,0,0,0.05) !important;
+    font-size: 16px !important;
+}
+
+/* Button styling */
+.stButton>button {
+    border-radius: 24px !important;
+    padding: 8px 24px !important;
+    background-color: #3b82f6 !important;
+    color: white !important;
+    font-weight: 500 !important;
+    border: none !important;
+}
+
+/* Suggestion cards */
+.prompt-suggestion {
+    padding: 16px 20px;
+    margin: 8px 0;
+    border-radius: 12px;
+    background-color: white;
+    cursor: pointer;
+    transition: all 0.2s;
+    border: 1px solid #e5e7eb;
+    box-shadow: 0 1px 3px rgba(0,0,0,0.05);
+}
+.prompt-suggestion:hover {
+    background-color: #f8fafc;
+    border-color: #d1d5db;
+    box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+}
+
+/* Workflow cards */
+.workflow-card {
+    padding: 16px 20px;
+    margin: 12px 0;
+    border-radius: 12px;
+    background-color: white;
+    border-left: 4px solid #3b82f6;
+    box-shadow: 0 1px 3px rgba(0,0,0,0.05);
+}
+
+/* Search result styling */
+.search-result {
+    padding: 16px 20px;
+    margin: 12px 0;
+    border-radius: 12px;
+    background-color: white;
+    border: 1px solid #e5e7eb;
+    box-shadow: 0 1px 3px rgba(0,0,0,0.05);
+}
+
+/* Sidebar styling */
+[data-testid="stSidebar"] {
+    background-color: #f9fafb !important;
+    border-right: 1px solid #e5e7eb !important;
+}
+
+/* Sandbox container */
+.sandbox-container {
+    width: 100%;
+    height: 600px;
+    border: 1px solid #e5e7eb;
+    border-radius: 12px;
+    margin-top: 20px;
+    box-shadow: 0 1px 3px rgba(0,0,0,0.05);
+}
+
+/* Title styling */
+h1 {
+    color: #111827 !important;
+}
+
+/* Subtle text */
+.subtle-text {
+    color: #6b7280;
+    font-size: 0.9rem;
+}
+</style>
+"""
 
 # Main app
 def main():
     st.set_page_config(page_title="Smart Search Engine", page_icon="🔍", layout="wide")
     
     # Custom CSS for Perplexity-like UI
-    st.markdown("""
-    <style>
-    /* Main container styling */
-    .stApp {
-        background-color: #f9fafb;
-    }
-    
-    /* Search bar styling */
-    .stTextInput>div>div>input {
-        padding: 16px 24px !important;
-        border-radius: 24px !important;
-        border: 1px solid #e5e7eb !important;
-        box-shadow: 0 1px 2px rgba(0,0,0,0.05) !important;
-        font-size: 16px !important;
-    }
-    
-    /* Button styling */
-    .stButton>button {
-        border-radius: 24px !important;
-        padding: 8px 24px !important;
-        background-color: #3b82f6 !important;
-        color: white !important;
-        font-weight: 500 !important;
-        border: none !important;
-    }
-    
-    /* Suggestion cards */
-    .prompt-suggestion {
-        padding: 16px 20px;
-        margin: 8px 0;
-        border-radius: 12px;
-        background-color: white;
-        cursor: pointer;
-        transition: all 0.2s;
-        border: 1px solid #e5e7eb;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.05);
-    }
-    .prompt-suggestion:hover {
-        background-color: #f8fafc;
-        border-color: #d1d5db;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-    }
-    
-    /* Workflow cards */
-    .workflow-card {
-        padding: 16px 20px;
-        margin: 12px 0;
-        border-radius: 12px;
-        background-color: white;
-        border-left: 4px solid #3b82f6;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.05);
-    }
-    
-    /* Search result styling */
-    .search-result {
-        padding: 16px 20px;
-        margin: 12px 0;
-        border-radius: 12px;
-        background-color: white;
-        border: 1px solid #e5e7eb;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.05);
-    }
-    
-    /* Sidebar styling */
-    [data-testid="stSidebar"] {
-        background-color: #f9fafb !important;
-        border-right: 1px solid #e5e7eb !important;
-    }
-    
-    /* Sandbox container */
-    .sandbox-container {
-        width: 100%;
-        height: 600px;
-        border: 1px solid #e5e7eb;
-        border-radius: 12px;
-        margin-top: 20px;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.05);
-    }
-    
-    /* Title styling */
-    h1 {
-        color: #111827 !important;
-    }
-    
-    /* Subtle text */
-    .subtle-text {
-        color: #6b7280;
-        font-size: 0.9rem;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(_css(), unsafe_allow_html=True)
     
     # Main header with logo
     col1, col2 = st.columns([0.1, 0.9])
@@ -272,19 +500,17 @@ def main():
         st.session_state.input_text = st.session_state.selected_suggestion
         st.session_state.search_input = st.session_state.selected_suggestion
         del st.session_state.selected_suggestion
-    
-    # Search input outside form for real-time suggestions
-    def on_input_change():
+        # Programmatic input changes don't fire on_change, so refresh suggestions here
         update_suggestions()
-
-    # Main search bar with focus
+    
+    # Main search bar with focus; outside a form for real-time suggestions
     with st.container():
         user_input = st.text_input(
             "Ask anything...",
             value=st.session_state.input_text,
             key="search_input",
             placeholder="Ask anything or type '/' for commands",
-            on_change=on_input_change,
+            on_change=update_suggestions,
             label_visibility="collapsed"
         )
     
@@ -300,59 +526,45 @@ def main():
                 st.session_state.search_history.append(user_input)
             st.rerun()
     with col2:
-        if st.button("I'm Feeling Lucky", use_container_width=True):
-            st.session_state.input_text = random.choice(PROMPTS['general'] + PROMPTS['tech'])
-            st.session_state.search_input = st.session_state.input_text
-            st.session_state.search_executed = True
-            st.rerun()
-    
-    # Update suggestions based on input changes
-    if user_input != st.session_state.last_input:
-        update_suggestions()
+        st.button("I'm Feeling Lucky", use_container_width=True, on_click=feeling_lucky)
     
     # Show prompt suggestions while typing
     if st.session_state.suggestions and not st.session_state.search_executed:
         st.subheader("Suggested prompts", divider="gray")
-        for suggestion in st.session_state.suggestions:
-            with stylable_container(
-                key=f"suggestion_{suggestion}",
-                css_styles="""
-                .prompt-suggestion {
-                    padding: 16px 20px;
-                    margin: 8px 0;
-                    border-radius: 12px;
-                    background-color: white;
-                    cursor: pointer;
-                    transition: all 0.2s;
-                    border: 1px solid #e5e7eb;
-                    box-shadow: 0 1px 3px rgba(0,0,0,0.05);
-                }
-                .prompt-suggestion:hover {
-                    background-color: #f8fafc;
-                    border-color: #d1d5db;
-                    box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-                }
-                """
-            ):
-                if st.button(suggestion, key=f"suggest_{suggestion}"):
-                    st.session_state.selected_suggestion = suggestion
-                    st.rerun()
+        # One widget for the whole list rather than a button per suggestion
+        st.pills(
+            "Suggested prompts",
+            st.session_state.suggestions,
+            key="suggestion_pick",
+            on_change=select_pick,
+            args=("suggestion_pick",),
+            label_visibility="collapsed"
+        )
     
     # Recent searches
     if st.session_state.search_history and not st.session_state.search_executed:
         st.subheader("Recent searches", divider="gray")
-        for search in reversed(st.session_state.search_history[-5:]):
-            if st.button(search, key=f"recent_{search}"):
-                st.session_state.selected_suggestion = search
-                st.rerun()
+        # Most recent first, each query once
+        recent = list(itertools.islice(dict.fromkeys(reversed(st.session_state.search_history)), 5))
+        st.pills(
+            "Recent searches",
+            recent,
+            key="recent_pick",
+            on_change=select_pick,
+            args=("recent_pick",),
+            label_visibility="collapsed"
+        )
     
     # Show workflows section in sidebar
     with st.sidebar:
         st.markdown("### ⚡ Quick Actions")
-        for workflow_name in WORKFLOWS:
+        _, workflows = load_resources()
+        for workflow_name, workflow in workflows.items():
             with st.expander(f"🔹 {workflow_name}"):
-                st.caption(WORKFLOWS[workflow_name]['description'])
+                st.caption(workflow['description'])
                 if st.button(f"Run {workflow_name}", key=f"run_{workflow_name}", use_container_width=True):
+                    # An explicit run fetches fresh results
+                    st.session_state.workflow_results = {}
                     execute_workflow(workflow_name)
                     st.rerun()
         